@@ -3,6 +3,7 @@ import uuid
 import json
 import os
 from dotenv import load_dotenv
+from cache import shared_cache
 
 load_dotenv()
 
@@ -12,6 +13,14 @@ LANGFLOW_ID = "17c6a20f-5697-4e9e-9763-3278ae51eb55"
 DATASTAX_ORG = "868193b5-f3c3-4f2e-a431-293f6000b00d"
 APPLICATION_TOKEN = os.getenv("LANGFLOW_TOKEN")
 
+# Earlier questions of a session included with each follow-up, and the
+# characters kept from each, so a follow-up grows by at most ~600 chars
+HISTORY_TURNS = 3
+HISTORY_QUESTION_CHARS = 200
+
+# How long generated macros are reused for the same profile and goals
+MACROS_TTL = 24 * 60 * 60
+
 
 def dict_to_string(obj, level=0):
     """Convert a dictionary to a readable string format."""
@@ -35,6 +44,20 @@ def dict_to_string(obj, level=0):
     return ", ".join(strings)
 
 
+def new_session() -> dict:
+    """
+    Create a conversation session for the ask-ai flow.
+    
+    Returns:
+        dict: Session with a stable Langflow session id and the
+        question/answer history
+    """
+    return {
+        "session_id": str(uuid.uuid4()),
+        "history": [],
+    }
+
+
 def _get_headers():
     """Get the required headers for API requests."""
     return {
@@ -45,13 +68,14 @@ def _get_headers():
     }
 
 
-def _run_flow(question: str, profile_str: str) -> str:
+def _run_flow(question: str, profile_str: str, session_id: str = None) -> str:
     """
     Run the Langflow ask-ai-v2 flow with the given question and profile.
     
     Args:
         question: The question or prompt to send to the AI
         profile_str: The user profile as a string
+        session_id: Langflow session to continue, a new one if None
         
     Returns:
         The AI response text
@@ -61,7 +85,7 @@ def _run_flow(question: str, profile_str: str) -> str:
     payload = {
         "output_type": "text",
         "input_type": "text",
-        "session_id": str(uuid.uuid4()),
+        "session_id": session_id or str(uuid.uuid4()),
         "tweaks": {
             "TextInput-KG2ew": {
                 "input_value": question
@@ -111,25 +135,52 @@ def _run_flow(question: str, profile_str: str) -> str:
         raise Exception(f"Error making API request: {e}")
 
 
-def ask_ai(profile, question):
+def ask_ai(profile, question, session=None):
     """
     Ask the AI a question based on the user's profile.
     
+    When a session from new_session() is given, the question is sent in
+    that Langflow session together with its last HISTORY_TURNS questions,
+    each cut to HISTORY_QUESTION_CHARS. Langflow session memory only
+    records chat messages and the ask-ai-v2 flow takes text inputs, so the
+    context has to travel in the prompt. Earlier answers are left out,
+    trading some context for a follow-up that is at most ~600 characters
+    larger than a first question. The full profile is sent every time. The
+    exchange is appended to the session history.
+    
     Args:
         profile: The user's profile dictionary
         question: The question to ask
+        session: Optional conversation session to continue
         
     Returns:
         The AI's response as a string
     """
-    profile_str = dict_to_string(profile)
-    return _run_flow(question, profile_str)
+    if session is None:
+        return _run_flow(question, dict_to_string(profile))
+
+    prompt = question
+    recent = session["history"][-HISTORY_TURNS:]
+    if recent:
+        earlier = "\n".join(
+            f"- {turn['question'][:HISTORY_QUESTION_CHARS]}" for turn in recent
+        )
+        prompt = f"Earlier questions in this conversation:\n{earlier}\n\nQuestion: {question}"
+
+    answer = _run_flow(prompt, dict_to_string(profile), session["session_id"])
+    session["history"].append({"question": question, "answer": answer})
+    return answer
 
 
 def get_macros(profile, goals):
     """
     Get AI-generated macro recommendations based on profile and goals.
     
+    Parsed results are cached for MACROS_TTL (24 hours) and shared by all
+    server processes, so asking again with the same profile and goals in
+    that window returns the same values without calling the flow. If the
+    response can't be parsed, default values are returned and not cached.
+    
     Args:
         profile: The user's general profile information
         goals: List of fitness goals
@@ -137,6 +188,21 @@ def get_macros(profile, goals):
     Returns:
         Dictionary with calories, protein, fat, and carbs values
     """
+    try:
+        return _fetch_macros(profile, goals)
+    except json.JSONDecodeError:
+        # Return default values if parsing fails
+        return {
+            "calories": 2000,
+            "protein": 140,
+            "fat": 60,
+            "carbs": 200
+        }
+
+
+@shared_cache(ttl=MACROS_TTL)
+def _fetch_macros(profile, goals):
+    """Run the macros flow and parse its JSON answer, raising JSONDecodeError."""
     api_url = f"{BASE_API_URL}/lf/{LANGFLOW_ID}/api/v1/run/macros"
     
     profile_str = dict_to_string(profile)
@@ -169,13 +235,5 @@ def get_macros(profile, goals):
         
     except requests.exceptions.RequestException as e:
         raise Exception(f"Error making API request: {e}")
-    except json.JSONDecodeError:
-        # Return default values if parsing fails
-        return {
-            "calories": 2000,
-            "protein": 140,
-            "fat": 60,
-            "carbs": 200
-        }
     except (KeyError, IndexError) as e:
         raise Exception(f"Error parsing response: {e}")
@@ -1,9 +1,11 @@
-import bcrypt
-from db import users_collection
+import db
+from cache import shared_cache
 
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt."""
+    import bcrypt
+
     salt = bcrypt.gensalt()
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
@@ -11,6 +13,8 @@ def hash_password(password: str) -> str:
 
 def verify_password(password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
+    import bcrypt
+
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
@@ -28,7 +32,7 @@ def signup_user(username: str, email: str, password: str, name: str) -> dict:
         dict: User document if successful, None if username already exists
     """
     # Check if username already exists
-    existing_user = users_collection.find_one({"_id": {"$eq": username}})
+    existing_user = db.users_collection.find_one({"_id": {"$eq": username}})
     if existing_user:
         return None
     
@@ -44,11 +48,13 @@ def signup_user(username: str, email: str, password: str, name: str) -> dict:
     }
     
     # Insert into database
-    users_collection.insert_one(user_doc)
+    db.users_collection.insert_one(user_doc)
+    get_user.invalidate(username)
     
     return user_doc
 
 
+@shared_cache(ttl=300)
 def get_user(username: str) -> dict:
     """
     Retrieve a user by username.
@@ -59,7 +65,7 @@ def get_user(username: str) -> dict:
     Returns:
         dict: User document if found, None otherwise
     """
-    return users_collection.find_one({"_id": {"$eq": username}})
+    return db.users_collection.find_one({"_id": {"$eq": username}})
 
 
 def authenticate_user(username: str, password: str) -> bool:
@@ -87,7 +93,7 @@ def get_all_users() -> dict:
     Returns:
         dict: Dictionary of users in the format expected by streamlit-authenticator
     """
-    users = list(users_collection.find())
+    users = list(db.users_collection.find())
     
     # Format for streamlit-authenticator
     user_dict = {
@@ -115,10 +121,11 @@ def update_user_email(username: str, new_email: str) -> bool:
     Returns:
         bool: True if successful, False otherwise
     """
-    result = users_collection.update_one(
+    result = db.users_collection.update_one(
         {"_id": username},
         {"$set": {"email": new_email}}
     )
+    get_user.invalidate(username)
     return result.modified_count > 0
 
 
@@ -134,8 +141,9 @@ def update_user_password(username: str, new_password: str) -> bool:
         bool: True if successful, False otherwise
     """
     password_hash = hash_password(new_password)
-    result = users_collection.update_one(
+    result = db.users_collection.update_one(
         {"_id": username},
         {"$set": {"password": password_hash}}
     )
+    get_user.invalidate(username)
     return result.modified_count > 0
@@ -0,0 +1,223 @@
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+# Values are pickled user documents, so the default lives in a private
+# per-user directory rather than the shared temp directory
+CACHE_PATH = os.getenv(
+    "GYM_AI_CACHE_PATH",
+    os.path.join(
+        os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "gym_ai", "cache.sqlite3"
+    ),
+)
+# Total size of cached values kept before the oldest entries are evicted
+CACHE_MAX_BYTES = int(os.getenv("GYM_AI_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# How long a worker may hold the right to compute a key before others retry
+LEASE_SECONDS = 60
+POLL_SECONDS = 0.05
+
+_MISSING = object()
+
+
+class SharedCache:
+    """
+    Key-value cache in a SQLite file shared by all server processes.
+
+    The database runs in WAL mode so readers never block on a writer.
+    Values are pickled, expire after their TTL and the oldest entries are
+    evicted once the total size passes max_bytes.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+        # Create the file 0600 before SQLite opens it: the -wal and -shm
+        # files take the database file's permissions when they are created
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+        os.chmod(path, 0o600)
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB, size INTEGER, "
+            "created REAL, expires REAL)"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, expires REAL)")
+
+    def _connection(self):
+        # sqlite3 connections can't be shared across Streamlit's script threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired."""
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            return default
+        return pickle.loads(row[0])
+
+    def set(self, key, value, ttl):
+        """Store value under key for ttl seconds."""
+        data = pickle.dumps(value)
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+            (key, data, len(data), now, now + ttl),
+        )
+        self._evict(conn, now)
+
+    def delete(self, key):
+        """Remove key from the cache."""
+        self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix):
+        """Remove every key starting with prefix."""
+        self._connection().execute(
+            "DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        for key, size in conn.execute(
+            "SELECT key, size FROM entries ORDER BY created"
+        ).fetchall():
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+    def _acquire_lease(self, key):
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM leases WHERE key = ? AND expires <= ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO leases VALUES (?, ?)", (key, now + LEASE_SECONDS)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def _release_lease(self, key):
+        self._connection().execute("DELETE FROM leases WHERE key = ?", (key,))
+
+    def get_or_compute(self, key, compute, ttl):
+        """
+        Return the cached value for key, computing and storing it if missing.
+
+        Only one process computes a given key at a time; the others wait
+        for its result instead of repeating the work. A None result is
+        returned but not stored, so a lookup that found nothing is retried
+        on the next call.
+
+        Args:
+            key: Cache key
+            compute: Function called without arguments to produce the value
+            ttl: Seconds the computed value stays valid
+
+        Returns:
+            The cached or computed value
+        """
+        while True:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            if self._acquire_lease(key):
+                break
+            time.sleep(POLL_SECONDS)
+
+        try:
+            # Another worker may have finished between our read and the lease
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                value = compute()
+                if value is not None:
+                    self.set(key, value, ttl)
+            return value
+        finally:
+            self._release_lease(key)
+
+
+@st.cache_resource
+def get_cache():
+    # Without a usable cache file the decorated functions run uncached
+    # rather than failing, see shared_cache()
+    try:
+        return SharedCache()
+    except (OSError, sqlite3.Error) as e:
+        logging.getLogger(__name__).warning(
+            "Shared cache disabled, cannot open %s: %s", CACHE_PATH, e
+        )
+        return None
+
+
+def shared_cache(ttl):
+    """
+    Decorator caching a function's results in the shared cache.
+
+    Results are keyed by the function name and its pickled arguments. The
+    wrapped function gets an invalidate(*args, **kwargs) method to drop the
+    entry for those arguments and a clear() method to drop all of its
+    entries. If the cache can't be opened the function is called directly.
+
+    Args:
+        ttl: Seconds a result stays valid
+    """
+    def decorator(func):
+        prefix = f"{func.__module__}.{func.__qualname__}"
+
+        def make_key(args, kwargs):
+            digest = hashlib.sha256(pickle.dumps((args, sorted(kwargs.items())))).hexdigest()
+            return f"{prefix}:{digest}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            shared = get_cache()
+            if shared is None:
+                return func(*args, **kwargs)
+            return shared.get_or_compute(
+                make_key(args, kwargs), lambda: func(*args, **kwargs), ttl
+            )
+
+        def invalidate(*args, **kwargs):
+            shared = get_cache()
+            if shared is not None:
+                shared.delete(make_key(args, kwargs))
+
+        def clear():
+            shared = get_cache()
+            if shared is not None:
+                shared.delete_prefix(f"{prefix}:")
+
+        wrapper.invalidate = invalidate
+        wrapper.clear = clear
+        return wrapper
+
+    return decorator
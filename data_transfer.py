@@ -0,0 +1,182 @@
+"""
+Export collections to gzipped NDJSON and import them back.
+
+Export streams every collection page by page into <dir>/<collection>.ndjson.gz.
+Notes are exported with their stored $vector but without $vectorize, so an
+import restores the embeddings as they were instead of computing them again
+(the Data API also rejects documents carrying both).
+
+Import reads those files line by line and upserts documents by _id in
+batches: the batch's ids are deleted and the batch is inserted again, so
+running it twice leaves the same data. An interrupted import can leave a
+batch missing; running it again restores it. Once a collection is
+imported, the shared-cache entries read from it are cleared so no worker
+keeps serving lookups made before or during the import.
+
+Usage:
+    python data_transfer.py export backup/ [--collections users notes]
+    python data_transfer.py import backup/ [--batch-size 100]
+"""
+import argparse
+import math
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import db
+
+
+def _data_api_types():
+    """Return astrapy 2's timestamp and vector types, or empty on astrapy 1."""
+    try:
+        from astrapy.data_types import DataAPITimestamp, DataAPIVector
+    except ImportError:
+        return ()
+    return DataAPITimestamp, DataAPIVector
+
+
+def _encode(value):
+    """json default hook for the non-JSON types the Data API returns."""
+    from astrapy.ids import UUID, ObjectId
+
+    if isinstance(value, datetime):
+        return {"$date": int(value.timestamp() * 1000)}
+    data_api_types = _data_api_types()
+    if data_api_types:
+        DataAPITimestamp, DataAPIVector = data_api_types
+        if isinstance(value, DataAPITimestamp):
+            return {"$date": value.timestamp_ms}
+        if isinstance(value, DataAPIVector):
+            return list(value.data)
+    if isinstance(value, UUID):
+        return {"$uuid": str(value)}
+    if isinstance(value, ObjectId):
+        return {"$objectId": str(value)}
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _decode(obj):
+    """json object hook reversing _encode."""
+    from astrapy.ids import UUID, ObjectId
+
+    if len(obj) == 1:
+        if "$date" in obj:
+            return datetime.fromtimestamp(obj["$date"] / 1000, timezone.utc)
+        if "$uuid" in obj:
+            return UUID(obj["$uuid"])
+        if "$objectId" in obj:
+            return ObjectId(obj["$objectId"])
+    return obj
+
+
+def _path(directory, name):
+    return os.path.join(directory, f"{name}.ndjson.gz")
+
+
+def export_collection(name, directory):
+    """
+    Stream a collection to a gzipped NDJSON file.
+
+    Args:
+        name: Collection to export
+        directory: Directory to write <name>.ndjson.gz into
+
+    Returns:
+        int: Number of documents written
+    """
+    count = 0
+    with gzip.open(_path(directory, name), "wt", encoding="utf-8") as out:
+        # The cursor fetches one page at a time, so memory stays flat
+        for document in db.get_collection(name).find({}, projection={"*": True}):
+            # Keep the stored embedding, see the module docstring
+            document.pop("$vectorize", None)
+            out.write(json.dumps(document, default=_encode))
+            out.write("\n")
+            count += 1
+    return count
+
+
+def _cached_lookups(name):
+    """Shared-cache functions whose results are read from a collection."""
+    from auth import get_user
+    from profiles import get_profile
+
+    return {"users": [get_user], "personal_data": [get_profile]}.get(name, [])
+
+
+def _upsert_batch(collection, batch):
+    # Replace existing copies in bulk: one delete per MAX_IN_VALUES ids and
+    # one insert_many for the whole batch, instead of a request per document
+    ids = [document["_id"] for document in batch]
+    for i in range(0, len(ids), db.MAX_IN_VALUES):
+        collection.delete_many({"_id": {"$in": ids[i:i + db.MAX_IN_VALUES]}})
+    collection.insert_many(batch, ordered=False)
+
+
+def import_collection(name, directory, batch_size=100):
+    """
+    Upsert the documents of a gzipped NDJSON file into a collection.
+
+    Args:
+        name: Collection to import into
+        directory: Directory holding <name>.ndjson.gz
+        batch_size: Documents read and written per batch
+
+    Returns:
+        int: Number of documents imported
+    """
+    collection = db.get_collection(name)
+    count = 0
+    batch = []
+    with gzip.open(_path(directory, name), "rt", encoding="utf-8") as source:
+        for line in source:
+            if not line.strip():
+                continue
+            batch.append(json.loads(line, object_hook=_decode))
+            if len(batch) >= batch_size:
+                _upsert_batch(collection, batch)
+                count += len(batch)
+                batch = []
+    if batch:
+        _upsert_batch(collection, batch)
+        count += len(batch)
+
+    for lookup in _cached_lookups(name):
+        lookup.clear()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("directory", help="Directory holding the NDJSON files")
+    parser.add_argument(
+        "--collections", nargs="+", default=db.collection_names, help="Collections to transfer"
+    )
+    parser.add_argument("--batch-size", type=int, default=100, help="Documents per import batch")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        os.makedirs(args.directory, exist_ok=True)
+
+    for name in args.collections:
+        start = time.perf_counter()
+        if args.command == "export":
+            count = export_collection(name, args.directory)
+        else:
+            if not os.path.exists(_path(args.directory, name)):
+                print(f"{name}: no export file, skipped")
+                continue
+            count = import_collection(name, args.directory, args.batch_size)
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed else 0
+        summary = f"{name}: {count} documents in {elapsed:.1f}s ({rate:.0f} docs/sec)"
+        if args.command == "import":
+            summary += f", {math.ceil(count / args.batch_size)} batches of up to {args.batch_size}"
+        print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-from astrapy import DataAPIClient
 from dotenv import load_dotenv
 import streamlit as st
 import os
@@ -8,22 +7,44 @@ load_dotenv()
 ENDPOINT = os.getenv("ASTRA_ENDPOINT")
 TOKEN = os.getenv("ASTRA_DB_APPLICATION_TOKEN")
 
+collection_names = ["personal_data", "notes", "users", "progress"]
+
+# Largest number of values the Data API accepts in an $in filter
+MAX_IN_VALUES = 100
+
+# Module attributes resolved lazily by __getattr__ below
+_collection_attributes = {
+    "personal_data_collection": "personal_data",
+    "notes_collection": "notes",
+    "users_collection": "users",
+    "progress_collection": "progress",
+}
+
 
 @st.cache_resource
 def get_db():
+    # Imported here so pages that never touch the database skip astrapy
+    from astrapy import DataAPIClient
+
     client = DataAPIClient(TOKEN)
     db = client.get_database_by_api_endpoint(ENDPOINT)
+
+    for collection in collection_names:
+        try:
+            db.create_collection(collection)
+        except:
+            pass
+
     return db
 
-db = get_db()
-collection_names = ["personal_data", "notes", "users"]
-
-for collection in collection_names:
-    try:
-        db.create_collection(collection)
-    except:
-        pass
-    
-personal_data_collection = db.get_collection("personal_data")
-notes_collection = db.get_collection("notes")
-users_collection = db.get_collection("users")
\ No newline at end of file
+
+@st.cache_resource
+def get_collection(name):
+    return get_db().get_collection(name)
+
+
+def __getattr__(name):
+    # Connect on first use of a collection instead of at import time
+    if name in _collection_attributes:
+        return get_collection(_collection_attributes[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
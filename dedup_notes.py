@@ -0,0 +1,78 @@
+"""
+Remove duplicate notes left from before notes carried a content hash.
+
+Notes are grouped by user and normalized content hash. The earliest note
+of each group is kept and given its hash, the others are deleted along
+with their embeddings.
+
+Usage:
+    python dedup_notes.py [--dry-run]
+"""
+import argparse
+from collections import defaultdict
+
+import db
+from form_submit import note_hash
+
+
+def dedup_notes(dry_run=False):
+    """
+    Delete duplicate notes and backfill missing hashes.
+
+    Args:
+        dry_run: Only report what would change
+
+    Returns:
+        dict: Counts of scanned, deleted and backfilled documents
+    """
+    groups = defaultdict(list)
+    scanned = 0
+    for note in db.notes_collection.find(
+        {}, projection={"user_id": True, "text": True, "hash": True, "metadata": True}
+    ):
+        scanned += 1
+        groups[(note.get("user_id"), note_hash(note.get("text") or ""))].append(note)
+
+    deleted = 0
+    backfilled = 0
+    for (_, content_hash), notes in groups.items():
+        notes.sort(key=lambda note: str(note.get("metadata", {}).get("ingested", "")))
+        keep, duplicates = notes[0], notes[1:]
+
+        needs_hash = keep.get("hash") != content_hash
+        if not needs_hash and not duplicates:
+            continue
+
+        if not dry_run:
+            times_added = sum(
+                note.get("metadata", {}).get("times_added", 1) for note in notes
+            )
+            db.notes_collection.update_one(
+                {"_id": keep["_id"]},
+                {"$set": {"hash": content_hash, "metadata.times_added": times_added}},
+            )
+            duplicate_ids = [note["_id"] for note in duplicates]
+            for i in range(0, len(duplicate_ids), db.MAX_IN_VALUES):
+                db.notes_collection.delete_many(
+                    {"_id": {"$in": duplicate_ids[i:i + db.MAX_IN_VALUES]}}
+                )
+        backfilled += needs_hash
+        deleted += len(duplicates)
+
+    return {"scanned": scanned, "deleted": deleted, "backfilled": backfilled}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Report without changing anything")
+    args = parser.parse_args()
+
+    report = dedup_notes(dry_run=args.dry_run)
+    prefix = "Would remove" if args.dry_run else "Removed"
+    print(f"Scanned {report['scanned']} notes")
+    print(f"{prefix} {report['deleted']} duplicate documents and their embeddings")
+    print(f"Hash added to {report['backfilled']} notes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
-from db import personal_data_collection, notes_collection
+import db
+from progress import record_progress
+from profiles import get_profile
 from datetime import datetime, timezone
+import hashlib
 
 
-def update_personal_info(existing, update_type, **kwargs):
+def update_personal_info(existing, update_type, record=True, **kwargs):
+    from astrapy.constants import ReturnDocument
+
     if update_type == "goals":
         existing["goals"] = kwargs.get("goals", [])
         update_field = {"goals": existing["goals"]}
@@ -10,22 +15,53 @@ def update_personal_info(existing, update_type, **kwargs):
         existing[update_type] = kwargs
         update_field = {update_type: existing[update_type]}
 
-    personal_data_collection.update_one(
-        {"_id": existing["_id"]}, {"$set": update_field}
+    stored = db.personal_data_collection.find_one_and_update(
+        {"_id": existing["_id"]},
+        {"$set": update_field},
+        return_document=ReturnDocument.AFTER,
     )
+    get_profile.invalidate(existing["_id"])
+    # Placeholder values written on profile creation are not real progress.
+    # Progress is logged from the stored document: the in-session profile
+    # can hold AI macros that were generated but never saved.
+    if record and stored and update_type in ("general", "nutrition"):
+        record_progress(stored)
     return existing
 
 
+def note_hash(note):
+    """Hash of a note's text with case and whitespace normalized."""
+    normalized = " ".join(note.split()).lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
 def add_note(note, profile_id):
+    # Imported here so astrapy only loads with the database, see db.get_db()
+    from astrapy.constants import ReturnDocument
+
+    content_hash = note_hash(note)
+    now = datetime.now(timezone.utc)
+
+    # A note with the same content only gets its metadata touched, so it
+    # is not vectorized and stored again
+    existing = db.notes_collection.find_one_and_update(
+        {"user_id": profile_id, "hash": content_hash},
+        {"$set": {"metadata.last_added": now}, "$inc": {"metadata.times_added": 1}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if existing:
+        return existing
+
     new_note = {
         "user_id": profile_id,
         "text": note,
+        "hash": content_hash,
         "$vectorize": note,
-        "metadata": {"ingested": datetime.now(timezone.utc)},
+        "metadata": {"ingested": now, "last_added": now, "times_added": 1},
     }
-    result = notes_collection.insert_one(new_note)
+    result = db.notes_collection.insert_one(new_note)
     new_note["_id"] = result.inserted_id
     return new_note
 
 def delete_note(_id):
-    return notes_collection.delete_one({"_id": _id})
+    return db.notes_collection.delete_one({"_id": _id})
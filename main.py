@@ -1,11 +1,12 @@
 import streamlit as st
 import extra_streamlit_components as stx
 import time
-from ai import ask_ai, get_macros
-from profiles import create_profile, get_notes, get_profile
-from form_submit import update_personal_info, add_note, delete_note
+from datetime import datetime, timedelta, timezone
 from auth import signup_user, authenticate_user, get_user
 
+# The AI, profile and notes modules are imported inside the functions that
+# use them, so login-page runs never load them
+
 st.set_page_config(page_title="Personal Fitness Tool", page_icon="💪", layout="wide")
 
 # Initialize cookie manager with a consistent key for reliable persistence
@@ -37,7 +38,9 @@ if not st.session_state.authenticated:
         stored_username = cookies.get("fitness_app_user")
         
         # Verify user still exists in database
-        if stored_username and get_user(stored_username):
+        user = get_user(stored_username) if stored_username else None
+        if user:
+            st.session_state.user = user
             st.session_state.authenticated = True
             st.session_state.username = stored_username
             st.session_state.cookies_loaded = True
@@ -57,6 +60,8 @@ if not st.session_state.authenticated:
 
 @st.fragment()
 def personal_data_form():
+    from form_submit import update_personal_info
+
     with st.form("personal_data"):
         st.header("Personal Data")
 
@@ -113,13 +118,20 @@ def personal_data_form():
                         age=age,
                         activity_level=activity_level,
                     )
-                    st.success("Information saved.")
+                # Full rerun so the progress chart shows the new point
+                st.session_state.personal_data_saved = True
+                st.session_state.pop("progress_series", None)
+                st.rerun()
             else:
                 st.warning("Please fill in all of the data!")
+        if st.session_state.pop("personal_data_saved", False):
+            st.success("Information saved.")
 
 
 @st.fragment()
 def goals_form():
+    from form_submit import update_personal_info
+
     profile = st.session_state.profile
     with st.form("goals_form"):
         st.header("Goals")
@@ -143,17 +155,24 @@ def goals_form():
 
 @st.fragment()
 def macros():
+    from ai import get_macros
+    from form_submit import update_personal_info
+
     profile = st.session_state.profile
     nutrition = st.container(border=True)
     nutrition.header("Macros")
-    if nutrition.button("Generate with AI"):
+    if nutrition.button(
+        "Generate with AI",
+        help="Results are reused for 24 hours while your profile and goals stay the same.",
+    ):
         with st.spinner("Generating macros with AI..."):
             try:
                 result = get_macros(profile.get("general"), profile.get("goals"))
                 profile["nutrition"] = result
                 st.session_state.profile = profile
+                # The form below is rendered after this, so it picks up the
+                # new values without another rerun
                 nutrition.success("AI has generated the results.")
-                st.rerun()
             except Exception as e:
                 nutrition.error(f"Error generating macros: {e}")
 
@@ -198,41 +217,111 @@ def macros():
                     fat=fat,
                     carbs=carbs,
                 )
-                st.success("Information saved")
+            # Full rerun so the progress chart shows the new point
+            st.session_state.nutrition_saved = True
+            st.session_state.pop("progress_series", None)
+            st.rerun()
+        if st.session_state.pop("nutrition_saved", False):
+            st.success("Information saved")
+
+@st.fragment()
+def progress_chart():
+    from progress import get_progress
+
+    st.header("Progress")
+    ranges = {"Last 30 days": 30, "Last 90 days": 90, "Last year": 365, "All time": None}
+    selected = st.selectbox("Range", list(ranges), index=1)
+    days = ranges[selected]
+    start = datetime.now(timezone.utc) - timedelta(days=days) if days else None
+
+    # Kept per range until a save records a new point, so reruns don't refetch
+    series_by_range = st.session_state.setdefault("progress_series", {})
+    if selected not in series_by_range:
+        series_by_range[selected] = get_progress(st.session_state.profile_id, start=start)
+    series = series_by_range[selected]
+    if not series["timestamps"]:
+        st.info("Save your personal data or macros to start tracking progress.")
+        return
+
+    st.subheader("Weight (kg)")
+    st.line_chart(
+        {"Date": series["timestamps"], "Weight": series["weight"]}, x="Date", y="Weight"
+    )
+    st.subheader("Macros")
+    st.line_chart(
+        {
+            "Date": series["timestamps"],
+            "Protein": series["protein"],
+            "Fat": series["fat"],
+            "Carbs": series["carbs"],
+        },
+        x="Date",
+        y=["Protein", "Fat", "Carbs"],
+    )
 
 @st.fragment()
 def notes():
+    from form_submit import add_note, delete_note
+
+    # Button callbacks run before the fragment renders, so the list below is
+    # already up to date and no extra rerun is needed
+    def on_delete(i, note_id):
+        delete_note(note_id)
+        st.session_state.notes.pop(i)
+
+    def on_add():
+        new_note = st.session_state[f"new_note_{st.session_state.note_input_key}"]
+        if new_note:
+            note = add_note(new_note, st.session_state.profile_id)
+            if all(n.get("_id") != note["_id"] for n in st.session_state.notes):
+                st.session_state.notes.append(note)
+            st.session_state.note_input_key += 1
+
     st.subheader("Notes: ")
     for i, note in enumerate(st.session_state.notes):
         cols = st.columns([5, 1])
         with cols[0]:
             st.text(note.get("text"))
         with cols[1]:
-            if st.button("Delete", key=i):
-                delete_note(note.get("_id"))
-                st.session_state.notes.pop(i)
-                st.rerun()
+            st.button(
+                "Delete",
+                key=f"delete_note_{note.get('_id')}",
+                on_click=on_delete,
+                args=(i, note.get("_id")),
+            )
     
     # Use a counter to reset the input widget
     if "note_input_key" not in st.session_state:
         st.session_state.note_input_key = 0
     
-    new_note = st.text_input("Add a new note: ", key=f"new_note_{st.session_state.note_input_key}")
-    if st.button("Add Note"):
-        if new_note:
-            note = add_note(new_note, st.session_state.profile_id)
-            st.session_state.notes.append(note)
-            st.session_state.note_input_key += 1
-            st.rerun()
+    st.text_input("Add a new note: ", key=f"new_note_{st.session_state.note_input_key}")
+    st.button("Add Note", on_click=on_add)
 
 @st.fragment()
 def ask_ai_func():
+    from ai import ask_ai, new_session
+
     st.subheader('Ask AI')
+    session = st.session_state.ai_session
+    for turn in session["history"]:
+        st.chat_message("user").write(turn["question"])
+        st.chat_message("assistant").write(turn["answer"])
+
     user_question = st.text_input("Ask AI a question: ")
-    if st.button("Ask AI"):
+    cols = st.columns([1, 1, 4])
+    with cols[0]:
+        ask = st.button("Ask AI")
+    with cols[1]:
+        st.button(
+            "New conversation",
+            disabled=not session["history"],
+            on_click=lambda: st.session_state.update(ai_session=new_session()),
+        )
+    if ask and user_question:
         with st.spinner():
-            result = ask_ai(st.session_state.profile, user_question)
-            st.write(result)
+            result = ask_ai(st.session_state.profile, user_question, session)
+        st.chat_message("user").write(user_question)
+        st.chat_message("assistant").write(result)
 
 def login_page():
     """Display login form."""
@@ -327,11 +416,18 @@ def auth_page():
 
 def forms():
     """Display main fitness forms after authentication."""
+    from ai import new_session
+    from form_submit import update_personal_info
+    from profiles import create_profile, get_notes, get_profile
+
     st.title("🏋️ Personal Fitness Tool")
     
     # Sidebar with user info and logout
     with st.sidebar:
-        user = get_user(st.session_state.username)
+        # Looked up once per login instead of on every full rerun
+        if "user" not in st.session_state:
+            st.session_state.user = get_user(st.session_state.username)
+        user = st.session_state.user
         st.write(f"### Welcome, {user['name']}! 👋")
         st.write(f"**Username:** {st.session_state.username}")
         st.write(f"**Email:** {user['email']}")
@@ -349,6 +445,12 @@ def forms():
                 del st.session_state.profile_id
             if "notes" in st.session_state:
                 del st.session_state.notes
+            if "ai_session" in st.session_state:
+                del st.session_state.ai_session
+            if "user" in st.session_state:
+                del st.session_state.user
+            if "progress_series" in st.session_state:
+                del st.session_state.progress_series
             
             # Delete cookie by setting it to expire immediately (max_age=0)
             # This is more reliable than delete() which may not work properly
@@ -367,7 +469,7 @@ def forms():
             # Create profile with user's name from auth
             profile_id, profile = create_profile(profile_id)
             # Update profile with user's actual name and save it to database
-            user = get_user(st.session_state.username)
+            user = st.session_state.user
             profile = update_personal_info(
                 profile,
                 "general",
@@ -376,7 +478,8 @@ def forms():
                 weight=profile["general"]["weight"],
                 height=profile["general"]["height"],
                 gender=profile["general"]["gender"],
-                activity_level=profile["general"]["activity_level"]
+                activity_level=profile["general"]["activity_level"],
+                record=False,
             )
 
         st.session_state.profile = profile
@@ -385,10 +488,15 @@ def forms():
     if "notes" not in st.session_state:
         st.session_state.notes = get_notes(st.session_state.profile_id)
 
+    # One Langflow conversation per login so follow-ups keep their context
+    if "ai_session" not in st.session_state:
+        st.session_state.ai_session = new_session()
+
     # Display all forms
     personal_data_form()
     goals_form()
     macros()
+    progress_chart()
     notes()
     ask_ai_func()
 
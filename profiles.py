@@ -1,4 +1,5 @@
-from db import personal_data_collection, notes_collection
+import db
+from cache import shared_cache
 
 def get_values(_id):
     return {
@@ -22,11 +23,13 @@ def get_values(_id):
     
 def create_profile(_id):
     profile_values = get_values(_id)
-    personal_data_collection.insert_one(profile_values)
+    db.personal_data_collection.insert_one(profile_values)
+    get_profile.invalidate(_id)
     return _id, profile_values
 
+@shared_cache(ttl=300)
 def get_profile(_id):
-    return personal_data_collection.find_one({"_id": {"$eq": _id}})
+    return db.personal_data_collection.find_one({"_id": {"$eq": _id}})
 
 def get_notes(_id):
-    return list(notes_collection.find({"user_id": {"$eq": _id}}))
\ No newline at end of file
+    return list(db.notes_collection.find({"user_id": {"$eq": _id}}))
\ No newline at end of file
@@ -0,0 +1,124 @@
+import db
+from datetime import datetime, timezone
+
+# Entries stored per chunk document
+CHUNK_SIZE = 200
+
+# Series kept for every entry, in addition to the timestamps
+COLUMNS = ["weight", "calories", "protein", "fat", "carbs"]
+
+
+def _entry_values(profile):
+    general = profile.get("general", {})
+    nutrition = profile.get("nutrition", {})
+    return {
+        "weight": general.get("weight"),
+        "calories": nutrition.get("calories"),
+        "protein": nutrition.get("protein"),
+        "fat": nutrition.get("fat"),
+        "carbs": nutrition.get("carbs"),
+    }
+
+
+def _new_chunk(user_id, timestamp, values):
+    chunk = {
+        "user_id": user_id,
+        "start": timestamp,
+        "end": timestamp,
+        "count": 1,
+        "timestamps": [timestamp],
+    }
+    for column in COLUMNS:
+        chunk[column] = [values[column]]
+    return chunk
+
+
+def record_progress(profile, at=None):
+    """
+    Append the current weight and macros of a profile to its progress log.
+
+    Entries are stored column-wise in chunk documents of up to CHUNK_SIZE
+    entries. A save is a single update that pushes onto the latest chunk
+    with room left, so concurrent saves can't overfill it; a new chunk is
+    only inserted when no chunk matched.
+
+    Args:
+        profile: Profile dictionary with "general" and "nutrition"
+        at: Time of the entry, now if None
+    """
+    at = at or datetime.now(timezone.utc)
+    timestamp = int(at.timestamp())
+    values = _entry_values(profile)
+
+    push = {"timestamps": timestamp}
+    push.update({column: values[column] for column in COLUMNS})
+    result = db.progress_collection.update_one(
+        {"user_id": profile["_id"], "count": {"$lt": CHUNK_SIZE}},
+        {"$push": push, "$inc": {"count": 1}, "$max": {"end": timestamp}},
+        sort={"start": -1},
+    )
+    if result.update_info["n"] == 0:
+        db.progress_collection.insert_one(_new_chunk(profile["_id"], timestamp, values))
+
+
+def _downsample(series, max_points):
+    """Average consecutive entries into at most max_points buckets."""
+    size = len(series["timestamps"])
+    if size <= max_points:
+        return series
+
+    result = {key: [] for key in series}
+    for bucket in range(max_points):
+        lo = bucket * size // max_points
+        hi = (bucket + 1) * size // max_points
+        for key, values in series.items():
+            present = [value for value in values[lo:hi] if value is not None]
+            result[key].append(sum(present) / len(present) if present else None)
+    return result
+
+
+def get_progress(user_id, start=None, end=None, max_points=200):
+    """
+    Get the progress series of a user for a date range.
+
+    Args:
+        user_id: Profile id of the user
+        start: Earliest datetime to include, no lower bound if None
+        end: Latest datetime to include, no upper bound if None
+        max_points: Maximum number of points per series, longer series
+            are averaged into buckets
+
+    Returns:
+        dict: "timestamps" as datetimes plus one list per column in COLUMNS
+    """
+    start_ts = int(start.timestamp()) if start else None
+    end_ts = int(end.timestamp()) if end else None
+
+    query = {"user_id": user_id}
+    if start_ts is not None:
+        query["end"] = {"$gte": start_ts}
+    if end_ts is not None:
+        query["start"] = {"$lte": end_ts}
+
+    series = {"timestamps": []}
+    series.update({column: [] for column in COLUMNS})
+    for chunk in db.progress_collection.find(query, sort={"start": 1}):
+        for i, timestamp in enumerate(chunk["timestamps"]):
+            if start_ts is not None and timestamp < start_ts:
+                continue
+            if end_ts is not None and timestamp > end_ts:
+                continue
+            series["timestamps"].append(timestamp)
+            for column in COLUMNS:
+                series[column].append(chunk[column][i])
+
+    # Chunks started by concurrent saves can interleave, keep entries in order
+    order = sorted(range(len(series["timestamps"])), key=series["timestamps"].__getitem__)
+    series = {key: [values[i] for i in order] for key, values in series.items()}
+
+    series = _downsample(series, max_points)
+    series["timestamps"] = [
+        datetime.fromtimestamp(timestamp, timezone.utc)
+        for timestamp in series["timestamps"]
+    ]
+    return series
@@ -0,0 +1,98 @@
+"""
+Measure the cold-start cost of the app.
+
+Prints an import-time breakdown of main.py (from ``python -X importtime``)
+grouped by top-level package, and the time until the first script run of
+the login page completes under Streamlit's AppTest.
+
+Usage:
+    python startup_profile.py [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+# The app's modules are imported from here, wherever the script is run from
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FIRST_RENDER_SCRIPT = """
+import time
+from streamlit.testing.v1 import AppTest
+
+start = time.perf_counter()
+AppTest.from_file("main.py", default_timeout=60).run()
+print(time.perf_counter() - start)
+"""
+
+
+def import_breakdown(module: str = "main") -> dict:
+    """
+    Import a module in a fresh interpreter and total the self time per package.
+
+    Args:
+        module: Module to import
+
+    Returns:
+        dict: Microseconds of import time keyed by top-level package
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=APP_DIR,
+    )
+    if result.returncode != 0:
+        # stderr mixes the timing lines with the traceback, keep only the latter
+        error = "\n".join(
+            line for line in result.stderr.splitlines() if not line.startswith("import time:")
+        )
+        raise RuntimeError(f"import {module} failed:\n{error}")
+    totals = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        totals[package] += int(self_us)
+    return dict(totals)
+
+
+def first_render_time() -> float:
+    """Run the app once in a fresh interpreter and return the seconds taken."""
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_RENDER_SCRIPT],
+        capture_output=True,
+        text=True,
+        cwd=APP_DIR,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh runs to take the median of")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list in the breakdown")
+    args = parser.parse_args()
+
+    runs = [import_breakdown() for _ in range(args.runs)]
+    packages = set().union(*runs)
+    medians = {
+        package: statistics.median(run.get(package, 0) for run in runs)
+        for package in packages
+    }
+    total = sum(medians.values())
+
+    print(f"Import time of main.py (median of {args.runs} runs): {total / 1000:.1f} ms")
+    for package, self_us in sorted(medians.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {package:<30} {self_us / 1000:8.1f} ms")
+
+    renders = [first_render_time() for _ in range(args.runs)]
+    print(f"Time to first render (median of {args.runs} runs): {statistics.median(renders) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
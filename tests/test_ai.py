@@ -0,0 +1,49 @@
+"""Tests for the prompts ai.ask_ai sends to the Langflow flow."""
+import pytest
+
+import ai
+
+PROFILE = {"_id": "alice", "general": {"weight": 60}, "goals": ["Muscle Gain"]}
+
+
+@pytest.fixture
+def flow(monkeypatch):
+    calls = []
+
+    def run_flow(question, profile_str, session_id=None):
+        calls.append({"question": question, "profile": profile_str, "session_id": session_id})
+        return "answer " + "x" * 1000
+
+    monkeypatch.setattr(ai, "_run_flow", run_flow)
+    return calls
+
+
+def test_first_question_is_sent_as_is(flow):
+    session = ai.new_session()
+
+    ai.ask_ai(PROFILE, "How much protein?", session)
+
+    assert flow[0]["question"] == "How much protein?"
+    assert flow[0]["profile"] == ai.dict_to_string(PROFILE)
+    assert flow[0]["session_id"] == session["session_id"]
+
+
+def test_follow_up_carries_bounded_recent_questions(flow):
+    session = ai.new_session()
+    questions = [f"question {i} " + "y" * 500 for i in range(5)]
+    for question in questions:
+        ai.ask_ai(PROFILE, question, session)
+
+    ai.ask_ai(PROFILE, "And on rest days?", session)
+    prompt = flow[-1]["question"]
+
+    assert prompt.endswith("Question: And on rest days?")
+    for question in questions[-ai.HISTORY_TURNS:]:
+        assert question[:ai.HISTORY_QUESTION_CHARS] in prompt
+        assert question not in prompt
+    assert "question 1 " not in prompt
+    # Earlier answers are never carried forward
+    assert "answer" not in prompt
+    assert len(prompt) - len("And on rest days?") <= 700
+    assert all(call["session_id"] == session["session_id"] for call in flow)
+    assert len(session["history"]) == 6
@@ -0,0 +1,133 @@
+"""Tests for the SQLite-backed shared cache, run against a temporary database."""
+import threading
+import time
+
+import pytest
+
+import cache
+
+
+class Clock:
+    """Stand-in for time.time() that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def shared(tmp_path):
+    return cache.SharedCache(str(tmp_path / "cache.sqlite3"))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    return clock
+
+
+def test_concurrent_callers_compute_once(shared):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(shared.get_or_compute("k", compute, 60)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+
+
+def test_lease_is_released_when_compute_raises(shared):
+    def fail():
+        raise RuntimeError("flow down")
+
+    with pytest.raises(RuntimeError):
+        shared.get_or_compute("k", fail, 60)
+
+    start = time.perf_counter()
+    assert shared.get_or_compute("k", lambda: "value", 60) == "value"
+    # A leaked lease would make this call wait LEASE_SECONDS
+    assert time.perf_counter() - start < cache.LEASE_SECONDS / 2
+
+
+def test_entries_expire_after_ttl(shared, clock):
+    shared.set("k", "value", ttl=10)
+    clock.now += 9
+    assert shared.get("k") == "value"
+
+    clock.now += 2
+    assert shared.get("k") is None
+    assert shared.get_or_compute("k", lambda: "fresh", 10) == "fresh"
+
+
+def test_oldest_entries_are_evicted_first(tmp_path, clock):
+    shared = cache.SharedCache(str(tmp_path / "cache.sqlite3"), max_bytes=250)
+    for key in ["a", "b", "c"]:
+        shared.set(key, "x" * 100, ttl=60)
+        clock.now += 1
+
+    assert shared.get("a") is None
+    assert shared.get("b") == "x" * 100
+    assert shared.get("c") == "x" * 100
+
+
+def test_none_results_are_not_cached(shared):
+    calls = []
+
+    def lookup():
+        calls.append(1)
+        return None
+
+    assert shared.get_or_compute("k", lookup, 60) is None
+    assert shared.get_or_compute("k", lookup, 60) is None
+    assert len(calls) == 2
+
+
+def test_decorator_invalidate_and_clear(shared, monkeypatch):
+    monkeypatch.setattr(cache, "get_cache", lambda: shared)
+    calls = []
+
+    @cache.shared_cache(ttl=60)
+    def lookup(key):
+        calls.append(key)
+        return key.upper()
+
+    assert lookup("a") == "A"
+    assert lookup("a") == "A"
+    assert calls == ["a"]
+
+    lookup.invalidate("a")
+    lookup("a")
+    assert calls == ["a", "a"]
+
+    lookup("b")
+    lookup.clear()
+    lookup("a")
+    lookup("b")
+    assert calls == ["a", "a", "b", "a", "b"]
+
+
+def test_decorator_calls_through_without_a_cache(monkeypatch):
+    monkeypatch.setattr(cache, "get_cache", lambda: None)
+
+    @cache.shared_cache(ttl=60)
+    def lookup(key):
+        return key.upper()
+
+    assert lookup("a") == "A"
+    lookup.invalidate("a")
+    lookup.clear()
@@ -0,0 +1,160 @@
+"""
+Count the remote calls made by interactions inside the app's fragments.
+
+The app runs under AppTest with every database collection and the Langflow
+HTTP client replaced by mocks, so each test can assert exactly which
+requests a click sends. AppTest executes every click as a full script run,
+so these counts also cover the sidebar and the other fragments.
+"""
+import copy
+import os
+from unittest import mock
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import cache
+import db
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+USER = {"_id": "alice", "email": "alice@example.com", "name": "Alice", "password": "x"}
+PROFILE = {
+    "_id": "alice",
+    "general": {
+        "name": "Alice",
+        "age": 30,
+        "weight": 60,
+        "height": 165,
+        "activity_level": "Moderately Active",
+        "gender": "Female",
+    },
+    "goals": ["Muscle Gain"],
+    "nutrition": {"calories": 2000, "protein": 140, "fat": 20, "carbs": 100},
+}
+NOTE = {"_id": "note-1", "user_id": "alice", "text": "Stretch after runs"}
+MACROS_TEXT = '{"calories": 2500, "protein": 180, "fat": 70, "carbs": 250}'
+
+
+class NoCache:
+    """Shared cache stand-in that always computes, so every lookup is counted."""
+
+    def get_or_compute(self, key, compute, ttl):
+        return compute()
+
+    def delete(self, key):
+        pass
+
+
+@pytest.fixture
+def collections(monkeypatch):
+    mocks = {name: mock.MagicMock(name=name) for name in db.collection_names}
+    mocks["users"].find_one.return_value = USER
+    # Fresh copies, since the app mutates the profile it is given
+    mocks["personal_data"].find_one.side_effect = lambda *args, **kwargs: copy.deepcopy(PROFILE)
+    mocks["personal_data"].find_one_and_update.side_effect = (
+        lambda *args, **kwargs: copy.deepcopy(PROFILE)
+    )
+    mocks["notes"].find.return_value = [NOTE]
+    mocks["notes"].find_one_and_update.return_value = None
+    mocks["notes"].insert_one.return_value = mock.Mock(inserted_id="note-2")
+    mocks["progress"].update_one.return_value = mock.Mock(update_info={"n": 1})
+    mocks["progress"].find.return_value = []
+    monkeypatch.setattr(db, "get_collection", lambda name: mocks[name])
+
+    monkeypatch.setattr(cache, "get_cache", NoCache)
+    return mocks
+
+
+@pytest.fixture
+def post(monkeypatch):
+    response = mock.Mock()
+    response.json.return_value = {
+        "outputs": [{"outputs": [{"results": {"message": {"data": {"text": MACROS_TEXT}}}}]}]
+    }
+    post = mock.Mock(return_value=response)
+    monkeypatch.setattr("requests.post", post)
+    return post
+
+
+@pytest.fixture
+def app(collections, post):
+    at = AppTest.from_file(MAIN, default_timeout=30)
+    at.session_state["authenticated"] = True
+    at.session_state["username"] = "alice"
+    at.session_state["cookies_loaded"] = True
+    at.run()
+    assert not at.exception
+    assert remote_calls(collections) == {
+        "users": ["find_one"],
+        "personal_data": ["find_one"],
+        "notes": ["find"],
+        "progress": ["find"],
+    }
+
+    for collection in collections.values():
+        collection.reset_mock()
+    post.reset_mock()
+    return at
+
+
+def remote_calls(collections):
+    """Collection methods called since the last reset, keyed by collection."""
+    return {
+        name: [call[0] for call in collection.method_calls]
+        for name, collection in collections.items()
+        if collection.method_calls
+    }
+
+
+def button(at, label, form_id=""):
+    return next(b for b in at.button if b.label == label and b.form_id == form_id)
+
+
+def test_add_note_only_writes_the_note(app, collections, post):
+    app.text_input(key="new_note_0").input("Drink more water")
+    button(app, "Add Note").click().run()
+
+    assert not app.exception
+    assert remote_calls(collections) == {"notes": ["find_one_and_update", "insert_one"]}
+    assert post.call_count == 0
+
+
+def test_delete_note_only_deletes_the_note(app, collections, post):
+    app.button(key="delete_note_note-1").click().run()
+
+    assert not app.exception
+    assert remote_calls(collections) == {"notes": ["delete_one"]}
+    assert post.call_count == 0
+
+
+def test_generate_macros_makes_one_flow_request(app, collections, post):
+    button(app, "Generate with AI").click().run()
+
+    assert not app.exception
+    assert remote_calls(collections) == {}
+    assert post.call_count == 1
+
+
+@pytest.mark.parametrize("form_id", ["personal_data", "nutrition_form"])
+def test_save_records_progress_and_refreshes_the_chart(app, collections, post, form_id):
+    button(app, "Save", form_id).click().run()
+
+    assert not app.exception
+    assert remote_calls(collections) == {
+        "personal_data": ["find_one_and_update"],
+        "progress": ["update_one", "find"],
+    }
+    assert post.call_count == 0
+
+
+def test_unsaved_ai_macros_are_not_recorded(app, collections, post):
+    button(app, "Generate with AI").click().run()
+    assert app.session_state["profile"]["nutrition"]["calories"] == 2500
+
+    button(app, "Save", "personal_data").click().run()
+
+    assert not app.exception
+    pushed = collections["progress"].update_one.call_args.args[1]["$push"]
+    assert pushed["calories"] == PROFILE["nutrition"]["calories"]
+    assert pushed["weight"] == PROFILE["general"]["weight"]